@@ -66,6 +66,10 @@ depth_first_layer = 0.5057600140571594
 
 info = copernicusmarine.subset(
     dataset_id="cmems_mod_glo_bgc_my_0.25deg_P1%s-m" % temporal_resolution,
+    # We download global maps over a long time range, which is exactly the
+    # access pattern the geo-series chunking of the ARCO data is optimized
+    # for (the time-series chunking would fetch many more chunks)
+    service="arco-geo-series",
     variables=["chl"],
     minimum_longitude=-180,
     maximum_longitude=180,
@@ -75,4 +79,7 @@ info = copernicusmarine.subset(
     end_datetime=end.strftime("%Y-%m-%dT23:59:59"),
     minimum_depth=depth_first_layer,
     maximum_depth=depth_first_layer,
+    # Make re-runs cheap: if the output file is already there from a
+    # previous (completed) run, do not download it again
+    skip_existing=True,
 )
@@ -25,7 +25,8 @@ The WRF model:
 
 # Required imports
 from abc import ABC, abstractmethod
-import warnings
+from typing import ClassVar
+import functools
 import numpy as np
 import xarray as xr
 
@@ -38,6 +39,10 @@ try:
     import cartopy
 except ImportError:
     pass
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
 
 # The following constants that are marked with ** use the same values as in
 # the WRF model code (WRF/share/module_model_constants.F). We use SI units for
@@ -52,33 +57,174 @@ constants = dict(
     grav_accel=9.81,  # Gravitational constant in (m s-2)
 )
 
+# Ratios of constants that appear in per-element expressions below, computed
+# once at module load so that slicing derived variables does not redo the
+# dictionary lookups and divisions
+_r_over_cp = constants["r_air"] / constants["cp_air"]
+_mm_water_over_dryair = constants["mm_water"] / constants["mm_dryair"]
+
+
+def open_wrf(filepath, chunks=None, **kwargs):
+    """Open a WRF output file, with dask chunking when available.
+
+    Opening the file with dask chunks keeps the variables (and the derived
+    variables defined in this module) lazy, so that multi-gigabyte WRF
+    histories can be processed without loading entire variables in memory.
+    We chunk along the Time (record) dimension by default, which matches the
+    way the WRF model writes its outputs, and keep the other dimensions
+    whole so that column- and plane-wise operations stay within one chunk.
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the WRF output file to open.
+    chunks : dict, optional
+        The dask chunking to use (passed on to xarray.open_dataset). The
+        default is one chunk per output time step. Requires the dask
+        package.
+    **kwargs
+        Additional arguments passed on to xarray.open_dataset.
+
+    Returns
+    -------
+    xarray.Dataset
+        The opened dataset (the accessor defined in this module is available
+        through its "wrf" attribute).
+
+    """
+    if chunks is None:
+        chunks = {"Time": 1}
+    return xr.open_dataset(filepath, chunks=chunks, **kwargs)
+
+
+@functools.lru_cache(maxsize=16)
+def _transformer_from_wkt(wkt):
+    """Return the pyproj Transformer corresponding to given WKT string.
+
+    Parameters
+    ----------
+    wkt : str
+        The WKT representation of the projected coordinate system.
+
+    Returns
+    -------
+    pyproj.Transformer
+        An object that converts (lon,lat) to (x,y). Converting the other way
+        around is done with the same object, by passing the "INVERSE"
+        direction to its transform method.
+
+    """
+    crs = pyproj.CRS.from_wkt(wkt)
+    return pyproj.Transformer.from_crs(crs.geodetic_crs, crs, always_xy=True)
+
 
-def _transformer_from_crs(crs, reverse=False):
+def _transformer_from_crs(crs):
     """Return the pyproj Transformer corresponding to given CRS.
 
+    Creating a Transformer is expensive compared to applying it to small
+    amounts of data, so we cache the Transformer objects (we use the WKT
+    representation of the CRS as the cache key because cartopy CRS objects
+    may not be hashable).
+
     Parameters
     ----------
     crs : pyproj.CRS
         The CRS object that represents the projected coordinate system.
-    reverse : bool
-        The direction of the Transformer:
-         - False: from (lon,lat) to (x,y).
-         - True: from (x,y) to (lon,lat).
 
     Returns
     -------
     pyproj.Transformer
-        An object that converts (lon,lat) to (x,y), or the other way around if
-        reverse is True.
+        An object that converts (lon,lat) to (x,y). Converting the other way
+        around is done with the same object, by passing the "INVERSE"
+        direction to its transform method.
+
+    """
+    return _transformer_from_wkt(crs.to_wkt())
+
+
+def _air_temperature_from(pot_temp, pressure):
+    """Return the air temperature corresponding to given WRF variables.
+
+    Having this kernel as a separate function lets the derived variables that
+    need both the air temperature and the atmospheric pressure (eg. the dry
+    air density) calculate the pressure only once, instead of recalculating
+    it through the air-temperature derived variable.
+
+    Parameters
+    ----------
+    pot_temp : xarray.DataArray
+        The potential temperature, in K.
+    pressure : xarray.DataArray
+        The atmospheric pressure, in Pa.
+
+    Returns
+    -------
+    xarray.DataArray
+        The air temperature, in K.
 
     """
-    fr = crs.geodetic_crs
-    to = crs
-    if reverse:
-        fr, to = to, fr
-    return pyproj.Transformer.from_crs(fr, to, always_xy=True)
+    # When numexpr is available and the data is a plain numpy array, we
+    # evaluate the expression with numexpr, whose vectorized power kernel is
+    # noticeably faster than libm pow on large arrays
+    if numexpr is not None and isinstance(pot_temp.data, np.ndarray):
+        # We pass the operands through local_dict rather than letting numexpr
+        # look them up in the calling frame
+        air_temp = numexpr.evaluate(
+            "pt * (p * inv_p0) ** e",
+            local_dict={
+                "pt": pot_temp.data,
+                "p": pressure.data,
+                "inv_p0": 1 / constants["pot_temp_p0"],
+                "e": _r_over_cp,
+            },
+        )
+        # numexpr promotes float32 inputs to float64
+        air_temp = air_temp.astype(pot_temp.dtype, copy=False)
+        return xr.DataArray(
+            air_temp, coords=pot_temp.coords, dims=pot_temp.dims
+        )
+    return pot_temp * (pressure / constants["pot_temp_p0"]) ** _r_over_cp
+
+
+def _center_bottom_top(array):
+    """Return given array, averaged onto grid box centers vertically.
+
+    Parameters
+    ----------
+    array : xarray.DataArray
+        An array staggered along the vertical dimension ("bottom_top_stag").
 
+    Returns
+    -------
+    xarray.DataArray
+        The array averaged onto the centers of the grid boxes (its vertical
+        dimension is "bottom_top"). The averaging is done in a single
+        two-operand expression so that only one full-size intermediate array
+        is materialized (and the operation stays lazy for dask-backed data).
 
+    """
+    lower = array.isel(bottom_top_stag=slice(None, -1))
+    upper = array.isel(bottom_top_stag=slice(1, None))
+    center = 0.5 * (lower + upper)
+    return center.rename({"bottom_top_stag": "bottom_top"})
+
+
+# Replacement table used by units_nice, built once at module load (the keys
+# are unit strings as found in WRF output files, the values are their
+# normalized form, or None for dimensionless variables)
+_units_replacements = {
+    "-": None,
+    "1": None,
+    "m2/s2": "m2 s-2",
+    "kg/m2": "kg m-2",
+    "kg/(s*m2)": "kg m-2 s-1",
+    "kg/(m2*s)": "kg m-2 s-1",
+    "kg/m2/s": "kg m-2 s-1",
+    "W m{-2}": "W m-2",
+}
+
+
+@functools.lru_cache(maxsize=256)
 def _units_mpl(units):
     """Return given units, formatted for displaying on Matplotlib plots.
 
@@ -95,13 +241,12 @@ def _units_mpl(units):
     """
     split = units.split()
     for i, s in enumerate(split):
-        n = len(s) - 1
-        while n >= 0 and s[n] in "-0123456789":
-            n -= 1
-        if n < 0:
+        # str.rstrip scans the trailing exponent characters in C code,
+        # instead of looping over them one by one in Python
+        head = s.rstrip("-0123456789")
+        if not head:
             raise ValueError("Could not process units.")
-        if n != len(s):
-            split[i] = "%s$^{%s}$" % (s[: n + 1], s[n + 1 :])
+        split[i] = "%s$^{%s}$" % (head, s[len(head) :])
     return " ".join(split)
 
 
@@ -117,6 +262,7 @@ class GenericDatasetAccessor(ABC):
 
     def __init__(self, dataset):
         self._dataset = dataset
+        self._units_checked = set()
 
     # Emulate the interface of xarray datasets
 
@@ -186,21 +332,9 @@ class GenericDatasetAccessor(ABC):
 
         """
         units = self.units(varname)
-        replacements = {
-            "-": None,
-            "1": None,
-            "m2/s2": "m2 s-2",
-            "kg/m2": "kg m-2",
-            "kg/(s*m2)": "kg m-2 s-1",
-            "kg/(m2*s)": "kg m-2 s-1",
-            "kg/m2/s": "kg m-2 s-1",
-            "W m{-2}": "W m-2",
-        }
-        try:
-            units = replacements[units]
-        except KeyError:
-            pass
-        return units
+        # Most units need no replacement, so we use dict.get rather than
+        # paying for a raised KeyError in the common case
+        return _units_replacements.get(units, units)
 
     def check_units(self, varname, expected, nice=True):
         """Make sure that units of given variable are as expected.
@@ -220,7 +354,16 @@ class GenericDatasetAccessor(ABC):
         ValueError
             If the units are not as expected.
 
+        Notes
+        -----
+        Since the units recorded in the NetCDF file do not change during the
+        lifetime of the dataset, successful checks are remembered and not
+        redone (derived variables run these checks on every access).
+
         """
+        key = (varname, expected, nice)
+        if key in self._units_checked:
+            return
         if nice:
             actual = self.units_nice(varname)
         else:
@@ -228,6 +371,7 @@ class GenericDatasetAccessor(ABC):
         if actual != expected:
             msg = 'Bad units: expected "%s", got "%s"' % (expected, actual)
             raise ValueError(msg)
+        self._units_checked.add(key)
 
     def units_mpl(self, varname):
         """Return the units of given variable, formatted for Matplotlib.
@@ -286,6 +430,9 @@ class GenericDatasetAccessor(ABC):
             The x and y values, respectively.
 
         """
+        if not np.isscalar(lon):
+            lon = np.ascontiguousarray(lon, dtype=np.float64)
+            lat = np.ascontiguousarray(lat, dtype=np.float64)
         tr = _transformer_from_crs(self.crs)
         return tr.transform(lon, lat)
 
@@ -305,8 +452,13 @@ class GenericDatasetAccessor(ABC):
             The longitude and latitude values, respectively.
 
         """
-        tr = _transformer_from_crs(self.crs, reverse=True)
-        return tr.transform(x, y)
+        if not np.isscalar(x):
+            x = np.ascontiguousarray(x, dtype=np.float64)
+            y = np.ascontiguousarray(y, dtype=np.float64)
+        tr = _transformer_from_crs(self.crs)
+        return tr.transform(
+            x, y, direction=pyproj.enums.TransformDirection.INVERSE
+        )
 
 
 @xr.register_dataset_accessor("wrf")
@@ -322,82 +474,115 @@ class WRFDatasetAccessor(GenericDatasetAccessor):
 
     # Facilities for handling geographical projections
 
-    @property
-    def crs_pyproj(self):
-        """The pyproj CRS corresponding to dataset."""
-        if self.attrs["POLE_LON"] != 0:
-            raise ValueError("Invalid POLE_LON: %f." % self.attrs["POLE_LON"])
-        if self.attrs["POLE_LAT"] not in (90, -90):
+    # Projection codes that exist in WRF but that we do not support (yet)
+    _proj_codes_notimplemented = (0, 102, 3, 4, 5, 6, 105, 203)
+
+    @functools.cached_property
+    def _crs_params(self):
+        """The PROJ parameters corresponding to dataset, as a dict.
+
+        The parameters are validated and assembled once per accessor; they
+        are the common source from which both the pyproj and the cartopy
+        CRS objects are built.
+
+        """
+        attrs = self.attrs
+        if attrs["POLE_LON"] != 0:
+            raise ValueError("Invalid POLE_LON: %f." % attrs["POLE_LON"])
+        if attrs["POLE_LAT"] not in (90, -90):
             raise ValueError("Invalid value for attribute POLE_LAT.")
-        proj = self.attrs["MAP_PROJ"]
-        if proj == 1:
-            crs = self._crs_pyproj_lcc
-        elif proj == 2:
-            crs = self._crs_pyproj_polarstereo
-        elif proj in (0, 102, 3, 4, 5, 6, 105, 203):
-            raise NotImplementedError("Projection code %d." % proj)
-        else:
+        proj = attrs["MAP_PROJ"]
+        build_params = self._crs_params_builders.get(proj)
+        if build_params is None:
+            if proj in self._proj_codes_notimplemented:
+                raise NotImplementedError("Projection code %d." % proj)
             raise ValueError("Invalid projection code: %d." % proj)
-        return crs
+        return build_params(self)
 
-    @property
-    def _crs_pyproj_lcc(self):
-        """The pyproj CRS corresponding to dataset.
+    def _crs_params_lcc(self):
+        """The PROJ parameters corresponding to dataset, as a dict.
 
         This method handles the specific case of Lambert conformal conic
         projections.
 
         """
+        attrs = self.attrs
         proj_name = "Lambert Conformal Conic"
-        map_proj_char = self.attrs.get("MAP_PROJ_CHAR", proj_name)
+        map_proj_char = attrs.get("MAP_PROJ_CHAR", proj_name)
         if map_proj_char != proj_name:
             raise ValueError("Invalid value for MAP_PROJ_CHAR.")
-        if self.attrs["STAND_LON"] != self.attrs["CEN_LON"]:
+        if attrs["STAND_LON"] != attrs["CEN_LON"]:
             raise ValueError("Inconsistency in central longitude values.")
-        if self.attrs["MOAD_CEN_LAT"] != self.attrs["CEN_LAT"]:
+        if attrs["MOAD_CEN_LAT"] != attrs["CEN_LAT"]:
             raise ValueError("Inconsistency in central latitude values.")
-        proj = dict(
+        # The false easting/northing and datum are the PROJ defaults; we
+        # spell them out because the cartopy CRS is built from this dict too
+        return dict(
             proj="lcc",
-            lat_0=self.attrs["CEN_LAT"],
-            lon_0=self.attrs["CEN_LON"],
-            lat_1=self.attrs["TRUELAT1"],
-            lat_2=self.attrs["TRUELAT2"],
+            lat_0=attrs["CEN_LAT"],
+            lon_0=attrs["CEN_LON"],
+            lat_1=attrs["TRUELAT1"],
+            lat_2=attrs["TRUELAT2"],
+            x_0=0,
+            y_0=0,
+            datum="WGS84",
         )
-        return pyproj.CRS.from_dict(proj)
 
-    @property
-    def _crs_pyproj_polarstereo(self):
-        """The pyproj CRS corresponding to dataset.
+    def _crs_params_polarstereo(self):
+        """The PROJ parameters corresponding to dataset, as a dict.
 
         This method handles the specific case of polar stereographic
         projections.
 
         """
+        attrs = self.attrs
         proj_name = "Polar Stereographic"
-        map_proj_char = self.attrs.get("MAP_PROJ_CHAR", proj_name)
+        map_proj_char = attrs.get("MAP_PROJ_CHAR", proj_name)
         if map_proj_char != proj_name:
             raise ValueError("Invalid value for MAP_PROJ_CHAR.")
-        if self.attrs["STAND_LON"] != self.attrs["CEN_LON"]:
+        if attrs["STAND_LON"] != attrs["CEN_LON"]:
             raise ValueError("Inconsistency in central longitude values.")
         for which in ("TRUELAT1", "TRUELAT2", "MOAD_CEN_LAT"):
-            if round(self.attrs[which], 4) != round(self.attrs["CEN_LAT"], 4):
+            if round(attrs[which], 4) != round(attrs["CEN_LAT"], 4):
                 raise ValueError("Inconsistency in true latitude values.")
-        proj = dict(
+        # The false easting/northing and datum are the PROJ defaults; we
+        # spell them out because the cartopy CRS is built from this dict too
+        return dict(
             proj="stere",
-            lat_0=self.attrs["POLE_LAT"],
-            lat_ts=self.attrs["TRUELAT1"],
-            lon_0=self.attrs["CEN_LON"],
+            lat_0=attrs["POLE_LAT"],
+            lat_ts=attrs["TRUELAT1"],
+            lon_0=attrs["CEN_LON"],
+            x_0=0,
+            y_0=0,
+            datum="WGS84",
         )
-        return pyproj.CRS.from_dict(proj)
 
-    @property
+    # Mapping from WRF projection codes to the builders defined above
+    _crs_params_builders: ClassVar[dict] = {
+        1: _crs_params_lcc,
+        2: _crs_params_polarstereo,
+    }
+
+    @functools.cached_property
+    def crs_pyproj(self):
+        """The pyproj CRS corresponding to dataset.
+
+        The CRS is built on first access and then cached on the accessor,
+        since the projection attributes of a dataset do not change.
+
+        """
+        return pyproj.CRS.from_dict(self._crs_params)
+
+    @functools.cached_property
     def crs_cartopy(self):
-        """The cartopy CRS corresponding to dataset."""
-        # We let self.crs_pyproj do all the quality checking
-        crs_pyproj = self.crs_pyproj
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            proj = crs_pyproj.to_dict()
+        """The cartopy CRS corresponding to dataset.
+
+        The CRS is built on first access and then cached on the accessor,
+        since the projection attributes of a dataset do not change.
+
+        """
+        # We let self._crs_params do all the quality checking
+        proj = self._crs_params
         if proj["proj"] == "lcc":
             crs = cartopy.crs.LambertConformal(
                 central_longitude=proj["lon_0"],
@@ -497,12 +682,12 @@ class DerivedVariable(ABC):
         self._dataset = dataset
 
     @abstractmethod
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """The slicing method.
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output. For example, if the variable
             of interest is 4-dimensional, use [:10, 0, :, :] to calculate its
             value for the first ten time steps, the first vertical layer, and
@@ -526,7 +711,7 @@ class DerivedVariable(ABC):
             The values object corresponding to the derived variable.
 
         """
-        return self[:].values
+        return self[...].values
 
     def __str__(self):
         """String representation of the DataArray of the derived variable.
@@ -539,18 +724,18 @@ class DerivedVariable(ABC):
         activated because lazy loading will be used in this case.
 
         """
-        return self[:].__str__()
+        return self[...].__str__()
 
 
 class WRFPotentialTemperature(DerivedVariable):
     """Derived variable for potential temperature from WRF outputs."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the potential temperature.
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -562,22 +747,21 @@ class WRFPotentialTemperature(DerivedVariable):
         varname, expected_units = "T", "K"
         self._dataset.wrf.check_units(varname, expected_units)
         pot_temp_t0 = constants["pot_temp_t0"]
-        return xr.DataArray(
-            pot_temp_t0 + self._dataset[varname].__getitem__(*args),
-            name="potential temperature",
-            attrs=dict(long_name="Potential temperature", units="K"),
+        pot_temp = pot_temp_t0 + self._dataset[varname][key]
+        return pot_temp.rename("potential temperature").assign_attrs(
+            long_name="Potential temperature", units="K"
         )
 
 
 class WRFAtmPressure(DerivedVariable):
     """Derived variable for atmospheric pressure from WRF outputs."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the atmospheric pressure.
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -589,23 +773,23 @@ class WRFAtmPressure(DerivedVariable):
         varname_p, varname_pb, expected_units = "P", "PB", "Pa"
         self._dataset.wrf.check_units(varname_p, expected_units)
         self._dataset.wrf.check_units(varname_pb, expected_units)
-        return xr.DataArray(
-            self._dataset[varname_p].__getitem__(*args)
-            + self._dataset[varname_pb].__getitem__(*args),
-            name="atmospheric pressure",
-            attrs=dict(long_name="Atmospheric pressure", units="Pa"),
+        pressure = (
+            self._dataset[varname_p][key] + self._dataset[varname_pb][key]
+        )
+        return pressure.rename("atmospheric pressure").assign_attrs(
+            long_name="Atmospheric pressure", units="Pa"
         )
 
 
 class WRFAirTemperature(DerivedVariable):
     """Derived variable for air temperature from WRF outputs."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the air temperature.
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -615,25 +799,23 @@ class WRFAirTemperature(DerivedVariable):
 
         """
         wrf = self._dataset.wrf
-        pot_temp = wrf.potential_temperature.__getitem__(*args)
-        pressure = wrf.atm_pressure.__getitem__(*args)
-        exponent = constants["r_air"] / constants["cp_air"]
-        return xr.DataArray(
-            pot_temp * (pressure / constants["pot_temp_p0"]) ** exponent,
-            name="air temperature",
-            attrs=dict(long_name="Air temperature", units="K"),
+        pot_temp = wrf.potential_temperature[key]
+        pressure = wrf.atm_pressure[key]
+        air_temp = _air_temperature_from(pot_temp, pressure)
+        return air_temp.rename("air temperature").assign_attrs(
+            long_name="Air temperature", units="K"
         )
 
 
 class WRFDensityOfDryAir(DerivedVariable):
     """Derived variable for dry air density from WRF outputs."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the density of dry air.
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -643,24 +825,24 @@ class WRFDensityOfDryAir(DerivedVariable):
 
         """
         wrf = self._dataset.wrf
-        pressure = wrf.atm_pressure.__getitem__(*args)
-        air_temp = wrf.air_temperature.__getitem__(*args)
-        return xr.DataArray(
-            pressure / (constants["r_air"] * air_temp),
-            name="dry air density",
-            attrs=dict(long_name="Dry air density", units="kg m-3"),
+        pressure = wrf.atm_pressure[key]
+        pot_temp = wrf.potential_temperature[key]
+        air_temp = _air_temperature_from(pot_temp, pressure)
+        density = pressure / (constants["r_air"] * air_temp)
+        return density.rename("dry air density").assign_attrs(
+            long_name="Dry air density", units="kg m-3"
         )
 
 
 class WRFRelativeHumidity(DerivedVariable):
     """WRF derived variable for relative humidity."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the relative humidity.
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -678,34 +860,57 @@ class WRFRelativeHumidity(DerivedVariable):
         wrf = self._dataset.wrf
         varname, expected_units = "QVAPOR", "kg kg-1"
         wrf.check_units(varname, expected_units)
-        q = wrf[varname].__getitem__(*args)
-
-        # Calculate the saturation water vapor pressure (in Pa)
-        temperature = wrf.air_temperature.__getitem__(*args) - 273.15
-        psat = 611.2 * np.exp(17.67 * temperature / (temperature + 243.5))
-
-        # Calculate the saturation water vapor mixing ratio
-        pressure = wrf.atm_pressure.__getitem__(*args)
-        r = constants["mm_water"] / constants["mm_dryair"]
-        qsat = r * psat / (pressure - psat)
-
-        # Calculate and return the relative humidity
-        return xr.DataArray(
-            100 * q / qsat,
-            name="relative humidity",
-            attrs=dict(long_name="Relative humidity", units="%"),
+        q = wrf[varname][key]
+
+        # Calculate the air temperature (the pressure is calculated only
+        # once and reused below for the saturation mixing ratio)
+        pressure = wrf.atm_pressure[key]
+        pot_temp = wrf.potential_temperature[key]
+        temperature = _air_temperature_from(pot_temp, pressure) - 273.15
+
+        # Calculate and return the relative humidity (the expression is the
+        # fused form of 100*q/qsat with qsat = r*psat/(pressure-psat), where
+        # psat is the saturation water vapor pressure in Pa). When numexpr is
+        # available and the data is a plain numpy array, we evaluate the
+        # expression with numexpr, which runs multi-threaded and without
+        # full-size intermediate arrays
+        r = _mm_water_over_dryair
+        if numexpr is not None and isinstance(q.data, np.ndarray):
+            # We pass the operands through local_dict rather than letting
+            # numexpr look them up in the calling frame
+            psat = numexpr.evaluate(
+                "611.2 * exp(17.67 * t / (t + 243.5))",
+                local_dict={"t": temperature.data},
+            )
+            rh = numexpr.evaluate(
+                "100 * qv * (p - psat) / (r * psat)",
+                local_dict={
+                    "qv": q.data,
+                    "p": pressure.data,
+                    "psat": psat,
+                    "r": r,
+                },
+            )
+            # numexpr promotes float32 inputs to float64
+            rh = rh.astype(q.dtype, copy=False)
+            rh = xr.DataArray(rh, coords=q.coords, dims=q.dims)
+        else:
+            psat = 611.2 * np.exp(17.67 * temperature / (temperature + 243.5))
+            rh = 100 * q * (pressure - psat) / (r * psat)
+        return rh.rename("relative humidity").assign_attrs(
+            long_name="Relative humidity", units="%"
         )
 
 
 class WRFAccumulatedPrecipitation(DerivedVariable):
     """Derived variable for accumulated total precipitation from WRF outputs."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the accumulated total precipitation.
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -717,27 +922,23 @@ class WRFAccumulatedPrecipitation(DerivedVariable):
         wrf = self._dataset.wrf
         wrf.check_units("RAINNC", "mm")
         wrf.check_units("RAINC", "mm")
-        rainnc = wrf["RAINNC"].__getitem__(*args)
-        rainc = wrf["RAINC"].__getitem__(*args)
+        rainnc = wrf["RAINNC"][key]
+        rainc = wrf["RAINC"][key]
         precip = rainnc + rainc
-        return xr.DataArray(
-            precip,
-            name="accumulated total precipitation",
-            attrs=dict(
-                long_name="Accumulated total precipitation", units="mm"
-            ),
+        return precip.rename("accumulated total precipitation").assign_attrs(
+            long_name="Accumulated total precipitation", units="mm"
         )
 
 
 class WRFGridCellArea(DerivedVariable):
     """Derived variable for calcuating grid cell (box) area from WRF outputs."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """grid cell (box) area.
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -749,24 +950,22 @@ class WRFGridCellArea(DerivedVariable):
         wrf = self._dataset.wrf
         dx = wrf.attrs["DX"]
         dy = wrf.attrs["DY"]
-        mapfrac_m = wrf["MAPFAC_M"].__getitem__(*args)
+        mapfrac_m = wrf["MAPFAC_M"][key]
         grid_cell_area = dx * dy / (mapfrac_m * mapfrac_m)
-        return xr.DataArray(
-            grid_cell_area,
-            name="grid cell area",
-            attrs=dict(long_name="Grid Cell Area", units="m2"),
+        return grid_cell_area.rename("grid cell area").assign_attrs(
+            long_name="Grid Cell Area", units="m2"
         )
 
 
 class WRFAltitudeASL(DerivedVariable):
     """The DerivedVariable object to calculate grid altitude above sea level."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the the grid cell altitude above sea level
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -778,25 +977,23 @@ class WRFAltitudeASL(DerivedVariable):
         wrf = self._dataset.wrf
         wrf.check_units("PH", "m2 s-2")
         wrf.check_units("PHB", "m2 s-2")
-        ph = wrf["PH"].__getitem__(*args)
-        pbh = wrf["PHB"].__getitem__(*args)
+        ph = wrf["PH"][key]
+        pbh = wrf["PHB"][key]
         alt = (ph + pbh) / constants["grav_accel"]
-        return xr.DataArray(
-            alt,
-            name="Altitude above sea level",
-            attrs=dict(long_name="Altitude above sea level", units="m"),
+        return alt.rename("Altitude above sea level").assign_attrs(
+            long_name="Altitude above sea level", units="m"
         )
 
 
 class WRFAltitudeAGL(DerivedVariable):
     """The DerivedVariable object to calculate grid altitude above ground level."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the the grid cell altitude above ground level
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -807,24 +1004,22 @@ class WRFAltitudeAGL(DerivedVariable):
         """
         wrf = self._dataset.wrf
         wrf.check_units("HGT", "m")
-        hgt = wrf["HGT"].__getitem__(*args)
-        alt = wrf.altitude_asl.__getitem__(*args) - hgt
-        return xr.DataArray(
-            alt,
-            name="Altitude above ground level",
-            attrs=dict(long_name="Altitude above ground level", units="m"),
+        hgt = wrf["HGT"][key]
+        alt = wrf.altitude_asl[key] - hgt
+        return alt.rename("Altitude above ground level").assign_attrs(
+            long_name="Altitude above ground level", units="m"
         )
 
 
 class WRFAltitudeASL_C(DerivedVariable):
     """The DerivedVariable object to calculate grid centerpoint altitude above sea level."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the the grid cell centerpoint altitude above sea level
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -834,31 +1029,24 @@ class WRFAltitudeASL_C(DerivedVariable):
 
         """
         wrf = self._dataset.wrf
-        alt = wrf.altitude_asl.__getitem__(*args)
-        alt_center = (
-            alt[:].isel(bottom_top_stag=slice(None, -1))
-            + alt[:].isel(bottom_top_stag=slice(1, None))
-        ) / 2.0
-        alt_center = alt_center.rename({"bottom_top_stag": "bottom_top"})
-        return xr.DataArray(
-            alt_center,
-            name="Altitude grid box centerpoint above sea level",
-            attrs=dict(
-                long_name="Altitude grid box centerpoint above sea level",
-                units="m",
-            ),
+        alt_center = _center_bottom_top(wrf.altitude_asl[key])
+        return alt_center.rename(
+            "Altitude grid box centerpoint above sea level"
+        ).assign_attrs(
+            long_name="Altitude grid box centerpoint above sea level",
+            units="m",
         )
 
 
 class WRFAltitudeAGL_C(DerivedVariable):
     """The DerivedVariable object to calculate grid centerpoint altitude above ground level."""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the the grid cell centerpoint altitude ground sea level
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -868,31 +1056,24 @@ class WRFAltitudeAGL_C(DerivedVariable):
 
         """
         wrf = self._dataset.wrf
-        alt = wrf.altitude_agl.__getitem__(*args)
-        alt_center = (
-            alt[:].isel(bottom_top_stag=slice(None, -1))
-            + alt[:].isel(bottom_top_stag=slice(1, None))
-        ) / 2.0
-        alt_center = alt_center.rename({"bottom_top_stag": "bottom_top"})
-        return xr.DataArray(
-            alt_center,
-            name="Altitude grid box centerpoint above ground level",
-            attrs=dict(
-                long_name="Altitude grid box centerpoint above ground level",
-                units="m",
-            ),
+        alt_center = _center_bottom_top(wrf.altitude_agl[key])
+        return alt_center.rename(
+            "Altitude grid box centerpoint above ground level"
+        ).assign_attrs(
+            long_name="Altitude grid box centerpoint above ground level",
+            units="m",
         )
 
 
 class WRFBoxDz(DerivedVariable):
     """The DerivedVariable object to calculate grid box vertical extent"""
 
-    def __getitem__(self, *args):
+    def __getitem__(self, key):
         """Return the the WRF grid box vertical extent
 
         Parameters
         ----------
-        *args: slice
+        key: slice
             Slice of interest in the WRF output.
 
         Return
@@ -902,16 +1083,12 @@ class WRFBoxDz(DerivedVariable):
 
         """
         wrf = self._dataset.wrf
-        alt = wrf.altitude_agl.__getitem__(*args)
+        alt = wrf.altitude_agl[key]
         box_dz = alt[:].isel(bottom_top_stag=slice(1, None)) - alt[:].isel(
             bottom_top_stag=slice(None, -1)
         )
         box_dz = box_dz.rename({"bottom_top_stag": "bottom_top"})
-        return xr.DataArray(
-            box_dz,
-            name="WRF grid box dz (vertical extent)",
-            attrs=dict(
-                long_name="Grid grid box dz (vertical extent)",
-                units="m",
-            ),
+        return box_dz.rename("WRF grid box dz (vertical extent)").assign_attrs(
+            long_name="Grid grid box dz (vertical extent)",
+            units="m",
         )
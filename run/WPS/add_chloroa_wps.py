@@ -7,6 +7,7 @@ import xarray as xr
 import numpy as np
 import pandas as pd
 import os
+import shutil
 import subprocess
 import sys
 
@@ -82,9 +83,11 @@ for dd in dates:
 
     chloroa = chloroa.sel(latitude=slice(met0.CLAT.min(),90))
     
+    datestr = dd.strftime('%Y-%m-%d')
+
     time_ = chloroa.time.values.astype(str)
     time_ = np.array([t[:10] for t in time_])
-    time_loc = np.where(time_==str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2))[0]
+    time_loc = np.where(time_==datestr)[0]
     chloroa = chloroa.isel(time=time_loc).squeeze()
     chloroa = chloroa.drop_vars(['time','depth'])
     chloroa.to_netcdf('chloroaloc.nc')
@@ -93,7 +96,7 @@ for dd in dates:
     #--- Apply some transformations on file to make it cdo-friendly
     #--- Mandatory to be able to regrid using cdo remapbil
     #--- Section in bash script using nco built-in functions
-    subprocess.run(["cp","chloroaloc.nc","temp1.nc"])
+    shutil.copy("chloroaloc.nc","temp1.nc")
     subprocess.run(["ncrename","-d","latitude,y","-d","longitude,x","-O","temp1.nc"])
     subprocess.run(["ncatted","-a","standard_name,latitude,c,c,lat","temp1.nc"])
     subprocess.run(["ncatted","-a","standard_name,longitude,c,c,lon","temp1.nc"])
@@ -117,8 +120,8 @@ for dd in dates:
 
     if dd==dates[-1]:
         hh='00'
-        metfile = 'met_em.d01.'+str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2)+'_'+hh+':00:00.nc'
-        metfile_tmp = 'met_em.d01.'+str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2)+'_'+hh+':00:00.nc.tmp'
+        metfile = 'met_em.d01.'+datestr+'_'+hh+':00:00.nc'
+        metfile_tmp = metfile+'.tmp'
         met = xr.open_dataset(simudir+metfile)
         met['CHLOROA'] = met.SEAICE.copy()
         met.CHLOROA.values = [chloroa_reg.chl.values]
@@ -127,9 +130,9 @@ for dd in dates:
         os.system('mv '+metfile_tmp+' '+simudir+metfile)
     else:
         for hh in hours:
-            metfile = 'met_em.d01.'+str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2)+'_'+hh+':00:00.nc'
-            metfile_tmp = 'met_em.d01.'+str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2)+'_'+hh+':00:00.nc.tmp'
-            met = xr.open_dataset(simudir+metfile)        
+            metfile = 'met_em.d01.'+datestr+'_'+hh+':00:00.nc'
+            metfile_tmp = metfile+'.tmp'
+            met = xr.open_dataset(simudir+metfile)
             met['CHLOROA'] = met.SEAICE.copy()
             met.CHLOROA.values = [chloroa_reg.chl.values]
             met.CHLOROA.attrs['units'] = 'mg/m3'
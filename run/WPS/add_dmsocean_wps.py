@@ -7,6 +7,7 @@ import xarray as xr
 import numpy as np
 import pandas as pd
 import os
+import shutil
 import subprocess
 import sys
 
@@ -80,7 +81,7 @@ for dd in dates:
     #--- Mandatory to be able to regrid using cdo remapbil
     #--- Section in bash script using nco built-in functions
     print('Transform DMS file')
-    subprocess.run(["cp","dmsloc.nc","temp1.nc"])
+    shutil.copy("dmsloc.nc","temp1.nc")
     # The following line does not work but the code crashes if you remove it
     # subprocess.run(["ncrename","-d","lat,y","-d","lon,x","-O","temp1.nc"])
     subprocess.run(["ncatted","-a","standard_name,latitude,c,c,lat","temp1.nc"])
@@ -105,10 +106,11 @@ for dd in dates:
     dms_reg1.close()
 
   # Create DMS_OCEAN variable in met_em file and fill with values from dms_reg.DMS
+  datestr = dd.strftime('%Y-%m-%d')
   if dd==dates[-1]:
     hh='00'
-    metfile = 'met_em.d01.'+str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2)+'_'+hh+':00:00.nc'
-    metfile_tmp = 'met_em.d01.'+str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2)+'_'+hh+':00:00.nc.tmp'
+    metfile = 'met_em.d01.'+datestr+'_'+hh+':00:00.nc'
+    metfile_tmp = metfile+'.tmp'
     met = xr.open_dataset(simudir+metfile)
     met['DMS_OCEAN'] = met.SEAICE.copy()
     met.DMS_OCEAN.values = [dms_reg.DMS.values]
@@ -117,9 +119,9 @@ for dd in dates:
     os.system('mv '+metfile_tmp+' '+simudir+metfile)
   else:
     for hh in hours:
-      metfile = 'met_em.d01.'+str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2)+'_'+hh+':00:00.nc'
-      metfile_tmp = 'met_em.d01.'+str(dd.year)+'-'+str(dd.month).zfill(2)+'-'+str(dd.day).zfill(2)+'_'+hh+':00:00.nc.tmp'
-      met = xr.open_dataset(simudir+metfile)        
+      metfile = 'met_em.d01.'+datestr+'_'+hh+':00:00.nc'
+      metfile_tmp = metfile+'.tmp'
+      met = xr.open_dataset(simudir+metfile)
       met['DMS_OCEAN'] = met.SEAICE.copy()
       met.DMS_OCEAN.values = [dms_reg.DMS.values]
       met.DMS_OCEAN.attrs['units'] = 'mg/m3'
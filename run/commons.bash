@@ -28,7 +28,7 @@ function check_paths {
     #
     for arg in "$@"; do
         echo "commons.bash: check_paths: checking path: $arg"
-        if [[ $(echo $arg | grep -cE "[[:space:]]") -ne 0 ]]; then
+        if [[ $arg =~ [[:space:]] ]]; then
             return 1
         elif [[ -z $arg ]]; then
             return 2